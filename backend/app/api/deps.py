@@ -2,16 +2,27 @@
 Inopsio AI Enterprise - API Dependencies
 The "Security Guard" that validates JWT tokens and extracts user/organization context.
 """
-from typing import Generator, Optional
+from dataclasses import dataclass
+from typing import Annotated, Any, AsyncGenerator, Dict, Optional, Tuple
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError
-from pydantic import ValidationError
+import jwt
 from prisma import Prisma
 
+from app.core import cache
 from app.core.config import settings
 from app.db.session import prisma
-from app.schemas.token import TokenPayload
+from app.schemas.user import UserOut
+
+# Bound once at import for the per-request decode. Settings are read at startup
+# and not expected to change at runtime; restart the app to rotate the key.
+_JWT_DECODE = jwt.decode
+_SECRET_KEY = settings.SECRET_KEY.encode()
+_ALGORITHMS = [settings.ALGORITHM]
+_DECODE_OPTIONS = {"verify_aud": False}
+
+# Loads only the user's primary membership alongside the user row
+_PRIMARY_MEMBERSHIP = {"memberships": {"where": {"primary": True}, "take": 1}}
 
 # The entry point for OAuth2 - looks for "Authorization: Bearer <token>"
 reusable_oauth2 = OAuth2PasswordBearer(
@@ -19,68 +30,146 @@ reusable_oauth2 = OAuth2PasswordBearer(
 )
 
 
-async def get_db() -> Generator:
-    """Provides the Prisma database instance to routes."""
-    if not prisma.is_connected():
-        await prisma.connect()
+@dataclass(frozen=True)
+class AuthContext:
+    """The authenticated user and the organization the request is scoped to."""
+    user: UserOut
+    organization_id: str
+
+
+async def get_db() -> AsyncGenerator[Prisma, None]:
+    """Provides the Prisma database instance to routes (connected in lifespan)."""
     yield prisma
 
 
-async def get_current_user(
-    db: Prisma = Depends(get_db),
+# Shorthand for route signatures: `db: deps.DB`
+DB = Annotated[Prisma, Depends(get_db)]
+
+
+async def get_token_claims(
     token: str = Depends(reusable_oauth2)
-):
+) -> Dict[str, Any]:
     """
-    Validates the JWT token and returns the current user.
-    If the token is invalid, it raises a 401 Unauthorized error.
+    Validates the JWT token and returns its claims (sub, exp, org_id).
+    If the token is invalid, it raises a 403 Forbidden error.
     """
+    # Reuse the validated claims when the same token was seen recently.
+    # Failed decodes are never cached, so a bad token is rejected every time.
+    key = cache.token_key(token)
+    claims = await cache.jwt_cache.get(key)
+    if claims is not None:
+        return claims
+    
     credentials_exception = HTTPException(
         status_code=status.HTTP_403_FORBIDDEN,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    
     try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
+        payload = _JWT_DECODE(
+            token, _SECRET_KEY, algorithms=_ALGORITHMS, options=_DECODE_OPTIONS
         )
-        token_data = TokenPayload(**payload)
-        if token_data.sub is None:
-            raise credentials_exception
-    except (JWTError, ValidationError):
+    except jwt.PyJWTError:
         raise credentials_exception
-    
-    user = await db.user.find_unique(where={"id": token_data.sub})
-    if not user:
+    # Plain checks instead of building a TokenPayload model on the hot path
+    sub = payload.get("sub")
+    if not isinstance(sub, str):
+        raise credentials_exception
+    org_id = payload.get("org_id")
+    claims = {
+        "sub": sub,
+        "exp": payload.get("exp"),
+        "org_id": org_id if isinstance(org_id, str) else None,
+    }
+    await cache.jwt_cache.set(key, claims)
+    return claims
+
+
+async def _load_user(
+    db: Prisma, sub: str, *, include_primary: bool = False
+) -> Tuple[UserOut, Optional[Any]]:
+    """
+    Returns (user, db_user). db_user is None when the user came from the cache.
+    With include_primary, a database load also fetches the primary membership.
+    """
+    # Only the safe public fields are cached, never relations or the password hash
+    user = await cache.user_cache.get(sub)
+    if user is not None:
+        return user, None
+    db_user = await db.user.find_unique(
+        where={"id": sub},
+        include=_PRIMARY_MEMBERSHIP if include_primary else None,
+    )
+    if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
+    user = UserOut.model_validate(db_user)
+    await cache.user_cache.set(sub, user)
+    return user, db_user
+
+
+async def get_current_user(
+    db: DB,
+    claims: Dict[str, Any] = Depends(get_token_claims),
+) -> UserOut:
+    """
+    Validates the JWT token and returns the current user.
+    Does not require an organization membership.
+    """
+    user, _ = await _load_user(db, claims["sub"])
     return user
 
 
 async def get_current_active_user(
-    current_user = Depends(get_current_user),
-):
+    current_user: UserOut = Depends(get_current_user),
+) -> UserOut:
     """Checks if the authenticated user is still active."""
     if not current_user.isActive:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
 
+async def get_auth_context(
+    db: DB,
+    claims: Dict[str, Any] = Depends(get_token_claims),
+) -> AuthContext:
+    """
+    Resolves the active user and the organization the request is scoped to.
+    The organization comes from the token's org_id claim when present.
+    Raises 403 for inactive users and users without an organization.
+    """
+    sub = claims["sub"]
+    # Login embeds the primary organization in the token; older tokens fall back to a lookup
+    organization_id = claims["org_id"] or await cache.org_cache.get(sub)
+    # Still one query on a cold cache: the primary membership rides along when needed
+    user, db_user = await _load_user(db, sub, include_primary=organization_id is None)
+    # Reject inactive users before spending a query on their organization
+    if not user.isActive:
+        raise HTTPException(status_code=403, detail="Inactive user")
+    
+    if organization_id is None:
+        if db_user is not None:
+            membership = db_user.memberships[0] if db_user.memberships else None
+        else:
+            # Point lookup on the (userId, primary) unique index, not a scan of all memberships
+            membership = await db.member.find_unique(
+                where={"userId_primary": {"userId": sub, "primary": True}}
+            )
+        if membership is None:
+            # Users without a primary flag (e.g. not yet backfilled) still get an organization
+            membership = await db.member.find_first(where={"userId": sub})
+        if not membership:
+            raise HTTPException(status_code=403, detail="User has no organization")
+        organization_id = membership.organizationId
+        await cache.org_cache.set(sub, organization_id)
+    
+    return AuthContext(user=user, organization_id=organization_id)
+
+
 async def get_organization_id(
-    current_user = Depends(get_current_active_user),
-    db: Prisma = Depends(get_db),
+    ctx: AuthContext = Depends(get_auth_context),
 ) -> str:
     """
     Extracts the organization_id for the current request context.
     This is the 'Key' used by your CRUDBase to filter data.
     """
-    # Get user's memberships with organization info
-    memberships = await db.member.find_many(
-        where={"userId": current_user.id},
-        include={"organization": True}
-    )
-    
-    if not memberships:
-        raise HTTPException(status_code=403, detail="User has no organization")
-    
-    # Return the first organization (primary org)
-    return memberships[0].organizationId
+    return ctx.organization_id
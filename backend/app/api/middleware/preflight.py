@@ -0,0 +1,94 @@
+"""
+Inopsio AI Enterprise - Preflight Middleware
+Answers CORS preflight requests before they reach the rest of the stack.
+"""
+from typing import Iterable, Optional, Pattern
+
+from starlette.middleware.cors import SAFELISTED_HEADERS
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+class PreflightShortCircuit:
+    """
+    Plain ASGI middleware that answers OPTIONS preflights from allowed origins
+    with an empty 204, skipping timing middleware, CORS middleware and routing.
+
+    Only preflights that CORSMiddleware would accept (origin, requested method
+    and requested headers all allowed) are answered here. Anything else is
+    passed through untouched so CORSMiddleware still has the final say.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        allow_origins: Iterable[str],
+        allow_methods: Iterable[str],
+        allow_headers: Iterable[str],
+        allow_origin_regex: Optional[Pattern[str]] = None,
+        max_age: int = 600,
+    ):
+        self.app = app
+        self.allow_origins = frozenset(origin.encode("latin-1") for origin in allow_origins)
+        self.allow_origin_regex = allow_origin_regex
+        allow_methods = list(allow_methods)
+        # Same header list CORSMiddleware builds, safelisted headers included
+        allow_headers = sorted(SAFELISTED_HEADERS | set(allow_headers))
+        self.allow_methods = frozenset(method.encode("latin-1") for method in allow_methods)
+        self.allow_headers = frozenset(header.lower() for header in allow_headers)
+        # Built once; only the echoed origin differs between responses
+        self._headers = [
+            (b"access-control-allow-credentials", b"true"),
+            (b"access-control-allow-methods", ", ".join(allow_methods).encode("latin-1")),
+            (b"access-control-allow-headers", ", ".join(allow_headers).encode("latin-1")),
+            (b"access-control-max-age", str(max_age).encode("latin-1")),
+            (b"vary", b"Origin"),
+        ]
+
+    def is_allowed_origin(self, origin: bytes) -> bool:
+        """Checks the raw Origin header against the explicit set, then the regex."""
+        if origin in self.allow_origins:
+            return True
+        if self.allow_origin_regex is None:
+            return False
+        return self.allow_origin_regex.fullmatch(origin.decode("latin-1")) is not None
+
+    def is_allowed_request(self, method: bytes, headers: Optional[bytes]) -> bool:
+        """Checks the requested method and headers the same way CORSMiddleware does."""
+        if method not in self.allow_methods:
+            return False
+        if headers is None:
+            return True
+        return all(
+            header.strip() in self.allow_headers
+            for header in headers.decode("latin-1").lower().split(",")
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and scope["method"] == "OPTIONS":
+            origin = request_method = request_headers = None
+            for name, value in scope["headers"]:
+                if name == b"origin":
+                    origin = value
+                elif name == b"access-control-request-method":
+                    request_method = value
+                elif name == b"access-control-request-headers":
+                    request_headers = value
+
+            # Only real preflights carry Access-Control-Request-Method; rejections
+            # are left to CORSMiddleware so both layers apply one policy
+            if (
+                origin
+                and request_method
+                and self.is_allowed_origin(origin)
+                and self.is_allowed_request(request_method, request_headers)
+            ):
+                await send({
+                    "type": "http.response.start",
+                    "status": 204,
+                    "headers": [(b"access-control-allow-origin", origin), *self._headers],
+                })
+                await send({"type": "http.response.body", "body": b""})
+                return
+
+        await self.app(scope, receive, send)
@@ -2,11 +2,11 @@
 Inopsio AI Enterprise - Auth Endpoints
 Handles login and token validation.
 """
+import asyncio
 from datetime import timedelta
 from typing import Any
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from prisma import Prisma
 
 from app.api import deps
 from app.core import security
@@ -19,7 +19,7 @@ router = APIRouter()
 
 @router.post("/login", response_model=Token)
 async def login_access_token(
-    db: Prisma = Depends(deps.get_db),
+    db: deps.DB,
     form_data: OAuth2PasswordRequestForm = Depends()
 ) -> Any:
     """
@@ -30,17 +30,29 @@ async def login_access_token(
     
     Returns a JWT access token.
     """
-    # 1. Find the user by email
-    user = await db.user.find_unique(where={"email": form_data.username})
+    # 1. Find the user by email, with the primary membership for the org_id claim
+    user = await db.user.find_unique(
+        where={"email": form_data.username},
+        include={"memberships": {"where": {"primary": True}, "take": 1}}
+    )
     
-    # 2. Verify password
-    if not user or not security.verify_password(form_data.password, user.hashedPassword):
+    # 2. Verify password (hashing runs in a worker thread to keep the event loop free)
+    is_valid, new_hash = (False, None)
+    if user:
+        is_valid, new_hash = await asyncio.to_thread(
+            security.verify_and_update_password, form_data.password, user.hashedPassword
+        )
+    if not is_valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # Upgrade legacy bcrypt hashes to argon2 transparently
+    if new_hash:
+        await db.user.update(where={"id": user.id}, data={"hashedPassword": new_hash})
+    
     # 3. Check if user is active
     if not user.isActive:
         raise HTTPException(
@@ -49,10 +61,14 @@ async def login_access_token(
         )
 
     # 4. Create and return the access token
+    # The primary organization rides in the token so requests skip the membership lookup
+    organization_id = user.memberships[0].organizationId if user.memberships else None
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     return {
         "access_token": security.create_access_token(
-            user.id, expires_delta=access_token_expires
+            user.id,
+            expires_delta=access_token_expires,
+            organization_id=organization_id,
         ),
         "token_type": "bearer",
     }
@@ -60,10 +76,11 @@ async def login_access_token(
 
 @router.post("/test-token", response_model=UserOut)
 async def test_token(
-    current_user = Depends(deps.get_current_active_user)
+    current_user: UserOut = Depends(deps.get_current_active_user)
 ) -> Any:
     """
     Test if the access token is valid and return the current user.
     Useful for frontend to verify auth state on app load.
+    Works for users that have not joined an organization yet.
     """
     return current_user
@@ -0,0 +1,203 @@
+"""
+Inopsio AI Enterprise - Auth Caches
+Short-lived caches that keep the auth hot path away from repeated decoding work.
+
+Each cache is a process-local L1 (cachetools) in front of an optional shared
+Redis L2, so multiple workers reuse each other's lookups. Redis is enabled by
+setting REDIS_URL; without it only the L1 is used.
+"""
+import hashlib
+import time
+from typing import Any, Callable, Dict, MutableMapping, Optional, Type
+
+import msgpack
+from cachetools import TLRUCache, TTLCache
+from loguru import logger
+from pydantic import BaseModel, ValidationError
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.schemas.user import UserOut
+
+# Upper bound (seconds) a decoded token is trusted before it is verified again
+JWT_CACHE_TTL = 30
+
+# How long (seconds) a user row / organization membership is reused
+USER_CACHE_TTL = 60
+
+# Redis socket timeouts (seconds). Kept tight so a hung Redis costs a miss,
+# not a stalled auth request.
+REDIS_SOCKET_TIMEOUT = 0.05
+
+# Shared L2 client, set up in the app lifespan
+_redis: Optional[Redis] = None
+
+
+async def init_redis(url: str) -> None:
+    """Connect the shared L2 cache. An empty URL leaves it disabled."""
+    global _redis
+    if url:
+        _redis = Redis.from_url(
+            url,
+            socket_timeout=REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=REDIS_SOCKET_TIMEOUT,
+        )
+
+
+async def close_redis() -> None:
+    """Close the shared L2 cache connection, if any."""
+    global _redis
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
+
+
+class TieredCache:
+    """
+    A process-local L1 cache backed by the shared Redis L2.
+    Values are msgpack-encoded in Redis. Redis errors and undecodable entries
+    count as misses, so auth keeps working (L1 only) if Redis is unavailable.
+    """
+
+    def __init__(
+        self,
+        local: MutableMapping[str, Any],
+        *,
+        prefix: str,
+        ttl: Callable[[Any], int],
+        model: Optional[Type[BaseModel]] = None,
+        validate: Optional[Callable[[Any], Any]] = None,
+    ):
+        """
+        :param local: The L1 mapping (a cachetools cache)
+        :param prefix: Redis key prefix for this cache
+        :param ttl: Seconds a value may live in Redis; values with ttl < 1 are not shared
+        :param model: Pydantic model used to encode/decode values, None for plain values
+        :param validate: Checks a plain value read from Redis; raises ValueError if malformed
+        """
+        self.local = local
+        self.prefix = prefix
+        self._ttl = ttl
+        self._model = model
+        self._validate = validate
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Return the cached value from L1, then L2, or None."""
+        value = self.local.get(key)
+        if value is not None or _redis is None:
+            return value
+        try:
+            raw = await _redis.get(self.prefix + key)
+        except RedisError as exc:
+            logger.warning("Redis cache read failed: {}", exc)
+            return None
+        if raw is None:
+            return None
+        try:
+            value = msgpack.unpackb(raw)
+            if self._model is not None:
+                value = self._model.model_validate(value)
+            elif self._validate is not None:
+                value = self._validate(value)
+        except (msgpack.UnpackException, ValueError, TypeError, ValidationError) as exc:
+            # Corrupt or stale-schema entry: drop it and reload from the database
+            logger.warning("Redis cache entry {} could not be decoded: {}", self.prefix + key, exc)
+            await self.delete(key)
+            return None
+        self.local[key] = value
+        return value
+
+    async def set(self, key: str, value: Any) -> None:
+        """Store a value in L1 and, if reachable, in L2."""
+        self.local[key] = value
+        ttl = self._ttl(value)
+        if _redis is None or ttl < 1:
+            return
+        data = value.model_dump(mode="json") if self._model is not None else value
+        try:
+            await _redis.set(self.prefix + key, msgpack.packb(data), ex=ttl)
+        except RedisError as exc:
+            logger.warning("Redis cache write failed: {}", exc)
+
+    async def delete(self, key: str) -> None:
+        """Remove a value from both levels."""
+        self.local.pop(key, None)
+        if _redis is None:
+            return
+        try:
+            await _redis.delete(self.prefix + key)
+        except RedisError as exc:
+            logger.warning("Redis cache delete failed: {}", exc)
+
+
+def _token_ttu(_key: str, claims: Dict[str, Any], now: float) -> float:
+    """Expire an entry after JWT_CACHE_TTL, or at the token's own `exp` if sooner."""
+    if claims["exp"] is None:
+        return now + JWT_CACHE_TTL
+    return min(now + JWT_CACHE_TTL, claims["exp"])
+
+
+def _token_ttl(claims: Dict[str, Any]) -> int:
+    """Redis TTL for a token entry, bounded by its `exp` claim."""
+    if claims["exp"] is None:
+        return JWT_CACHE_TTL
+    return min(JWT_CACHE_TTL, int(claims["exp"] - time.time()))
+
+
+def _check_claims(value: Any) -> Dict[str, Any]:
+    """Shape check for claims read back from Redis (sub, exp, org_id)."""
+    if not isinstance(value, dict):
+        raise ValueError("claims must be a dict")
+    exp = value.get("exp")
+    if (
+        not isinstance(value.get("sub"), str)
+        or not (exp is None or (isinstance(exp, (int, float)) and not isinstance(exp, bool)))
+        or not isinstance(value.get("org_id"), (str, type(None)))
+    ):
+        raise ValueError("claims must have a str sub, a numeric or null exp and org_id")
+    return {"sub": value["sub"], "exp": exp, "org_id": value.get("org_id")}
+
+
+def _check_org_id(value: Any) -> str:
+    """Shape check for an organization id read back from Redis."""
+    if not isinstance(value, str):
+        raise ValueError("organization id must be a str")
+    return value
+
+
+# Validated claims (sub, exp, org_id) keyed by SHA-256(token).
+# The timer is wall-clock time so entries line up with the JWT `exp` claim.
+jwt_cache = TieredCache(
+    TLRUCache(maxsize=10_000, ttu=_token_ttu, timer=time.time),
+    prefix="auth:",
+    ttl=_token_ttl,
+    validate=_check_claims,
+)
+
+
+def token_key(token: str) -> str:
+    """Cache key for a bearer token. Raw tokens are never stored."""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+# Safe user snapshots (UserOut) keyed by user id
+user_cache = TieredCache(
+    TTLCache(maxsize=5_000, ttl=USER_CACHE_TTL),
+    prefix="auth:user:",
+    ttl=lambda _: USER_CACHE_TTL,
+    model=UserOut,
+)
+
+# Primary organization id keyed by user id
+org_cache = TieredCache(
+    TTLCache(maxsize=5_000, ttl=USER_CACHE_TTL),
+    prefix="auth:org:",
+    ttl=lambda _: USER_CACHE_TTL,
+    validate=_check_org_id,
+)
+
+
+async def invalidate_user(user_id: str) -> None:
+    """Drop cached data for a user after it changes."""
+    await user_cache.delete(user_id)
+    await org_cache.delete(user_id)
@@ -4,22 +4,28 @@ Handles password hashing and JWT token creation/verification.
 """
 from datetime import datetime, timedelta, timezone
 from typing import Any
-from jose import jwt
+import jwt
 from passlib.context import CryptContext
 
 from app.core.config import settings
 
-# Password hashing context using bcrypt
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing context: argon2id for new hashes, bcrypt kept to verify old ones.
+# bcrypt hashes are marked deprecated and get re-hashed on the next successful login.
+pwd_context = CryptContext(schemes=["argon2", "bcrypt"], default="argon2", deprecated="auto")
 
 
-def create_access_token(subject: str | Any, expires_delta: timedelta | None = None) -> str:
+def create_access_token(
+    subject: str | Any,
+    expires_delta: timedelta | None = None,
+    organization_id: str | None = None,
+) -> str:
     """
     Create a JWT access token.
     
     Args:
         subject: The subject of the token (usually user_id)
         expires_delta: How long until the token expires
+        organization_id: Primary organization, embedded as the `org_id` claim
         
     Returns:
         Encoded JWT token string
@@ -32,6 +38,8 @@ def create_access_token(subject: str | Any, expires_delta: timedelta | None = No
         )
     
     to_encode = {"exp": expire, "sub": str(subject)}
+    if organization_id:
+        to_encode["org_id"] = organization_id
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
@@ -41,6 +49,16 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    """
+    Verify a password and re-hash it if it uses a deprecated scheme.
+    Returns (is_valid, new_hash); new_hash is None when no upgrade is needed.
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
 def get_password_hash(password: str) -> str:
     """Hash a password for storage."""
     return pwd_context.hash(password)
@@ -2,8 +2,8 @@
 Inopsio AI Enterprise - Multi-Tenant CRUD Base
 The "Guardian" that auto-scopes all database queries by organization_id.
 """
-from typing import Generic, TypeVar, List, Optional, Any
-from pydantic import BaseModel
+from typing import Generic, TypeVar, List, Optional, Any, Tuple, Type
+from pydantic import BaseModel, TypeAdapter
 from prisma import Prisma
 
 # Define Type Variables for your Models and Schemas
@@ -20,15 +20,26 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     preventing data leakage between tenants.
     
     Usage:
-        domain = CRUDBase[Domain, DomainCreate, DomainUpdate]("domain")
+        domain = CRUDBase[Domain, DomainCreate, DomainUpdate]("domain", DomainCreate, DomainUpdate)
     """
     
-    def __init__(self, model_name: str):
+    def __init__(
+        self,
+        model_name: str,
+        create_schema: Type[CreateSchemaType],
+        update_schema: Type[UpdateSchemaType],
+    ):
         """
         Initialize the CRUD handler.
         :param model_name: The name of the Prisma model (e.g., 'user', 'domain')
+        :param create_schema: Pydantic schema accepted by create/create_many
+        :param update_schema: Pydantic schema accepted by update
         """
         self.model_name = model_name
+        # Built once per handler and reused to dump incoming schemas.
+        # Dumps pass serialize_as_any=True so subclass fields are kept, as model_dump() does.
+        self._create_adapter = TypeAdapter(create_schema)
+        self._update_adapter = TypeAdapter(update_schema)
 
     async def get(
         self, db: Prisma, *, id: str, organization_id: str
@@ -40,36 +51,77 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         )
 
     async def get_multi(
-        self, db: Prisma, *, organization_id: str, skip: int = 0, limit: int = 100
-    ) -> List[ModelType]:
-        """Fetch multiple records for a specific organization with pagination."""
+        self,
+        db: Prisma,
+        *,
+        organization_id: str,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+    ) -> Tuple[List[ModelType], Optional[str]]:
+        """
+        Fetch a page of records for a specific organization (keyset pagination).
+        Returns (records, next_cursor); pass next_cursor back as `cursor` for
+        the following page. It is None on the last page.
+        
+        Models served by this should declare
+        @@index([organization_id, created_at(sort: Desc), id]).
+        """
         model = getattr(db, self.model_name)
-        return await model.find_many(
+        # One extra row tells us whether another page exists; its id is the next cursor
+        records = await model.find_many(
             where={"organization_id": organization_id},
-            skip=skip,
-            take=limit,
-            order={"created_at": "desc"}
+            cursor={"id": cursor} if cursor else None,
+            take=limit + 1,
+            order=[{"created_at": "desc"}, {"id": "desc"}]
         )
+        if len(records) > limit:
+            return records[:limit], records[limit].id
+        return records, None
 
     async def create(
         self, db: Prisma, *, obj_in: CreateSchemaType, organization_id: str
     ) -> ModelType:
         """Create a new record automatically linked to the organization."""
         model = getattr(db, self.model_name)
-        data = obj_in.model_dump()
+        data = self._create_adapter.dump_python(obj_in, serialize_as_any=True)
         data["organization_id"] = organization_id
         return await model.create(data=data)
 
+    async def create_many(
+        self, db: Prisma, *, objs_in: List[CreateSchemaType], organization_id: str
+    ) -> int:
+        """
+        Bulk-create records linked to the organization in a single insert.
+        Returns the count of created records.
+        """
+        model = getattr(db, self.model_name)
+        data = [
+            {
+                **self._create_adapter.dump_python(obj_in, serialize_as_any=True),
+                "organization_id": organization_id,
+            }
+            for obj_in in objs_in
+        ]
+        return await model.create_many(data=data)
+
     async def update(
         self, db: Prisma, *, id: str, obj_in: UpdateSchemaType, organization_id: str
     ) -> Optional[ModelType]:
-        """Update a record only if it belongs to the organization."""
+        """
+        Update a record only if it belongs to the organization.
+        Ownership is enforced in the UPDATE itself; returns None if nothing matched.
+        """
         model = getattr(db, self.model_name)
-        data = obj_in.model_dump(exclude_unset=True)
-        return await model.update(
-            where={"id": id},
+        data = self._update_adapter.dump_python(
+            obj_in, exclude_unset=True, serialize_as_any=True
+        )
+        count = await model.update_many(
+            where={"id": id, "organization_id": organization_id},
             data=data
         )
+        if count == 0:
+            return None
+        return await model.find_unique(where={"id": id})
 
     async def remove(
         self, db: Prisma, *, id: str, organization_id: str
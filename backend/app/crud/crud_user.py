@@ -2,9 +2,11 @@
 Inopsio AI Enterprise - User CRUD
 Specialized CRUD operations for users with password hashing.
 """
-from typing import Optional, Any
+import asyncio
+from typing import List, Optional, Any
 from prisma import Prisma
 
+from app.core.cache import invalidate_user
 from app.crud.base import CRUDBase
 from app.schemas.user import UserCreate, UserUpdate
 from app.core.security import get_password_hash, verify_password
@@ -29,13 +31,32 @@ class CRUDUser(CRUDBase[Any, UserCreate, UserUpdate]):
         Create a new user with hashed password.
         Overrides base create to handle password transformation.
         """
-        db_obj_data = obj_in.model_dump()
-        # Hash the password before saving
+        db_obj_data = self._create_adapter.dump_python(obj_in, serialize_as_any=True)
+        # Hash the password before saving (off the event loop)
         password = db_obj_data.pop("password")
-        db_obj_data["hashedPassword"] = get_password_hash(password)
+        db_obj_data["hashedPassword"] = await asyncio.to_thread(get_password_hash, password)
         
         return await db.user.create(data=db_obj_data)
 
+    async def create_many(self, db: Prisma, *, objs_in: List[UserCreate]) -> int:
+        """
+        Bulk-create users with hashed passwords in a single insert.
+        Overrides base create_many: users are not scoped to an organization.
+        Returns the count of created records.
+        """
+        data = [
+            self._create_adapter.dump_python(obj_in, serialize_as_any=True)
+            for obj_in in objs_in
+        ]
+        # Hash all passwords in worker threads before the insert
+        hashes = await asyncio.gather(
+            *(asyncio.to_thread(get_password_hash, item.pop("password")) for item in data)
+        )
+        for item, hashed in zip(data, hashes):
+            item["hashedPassword"] = hashed
+        
+        return await db.user.create_many(data=data)
+
     async def authenticate(
         self, db: Prisma, *, email: str, password: str
     ) -> Optional[Any]:
@@ -46,7 +67,7 @@ class CRUDUser(CRUDBase[Any, UserCreate, UserUpdate]):
         user = await self.get_by_email(db, email=email)
         if not user:
             return None
-        if not verify_password(password, user.hashedPassword):
+        if not await asyncio.to_thread(verify_password, password, user.hashedPassword):
             return None
         return user
 
@@ -57,18 +78,46 @@ class CRUDUser(CRUDBase[Any, UserCreate, UserUpdate]):
         Update user with optional password change.
         If password is provided, it gets hashed.
         """
-        update_data = obj_in.model_dump(exclude_unset=True)
+        update_data = self._update_adapter.dump_python(
+            obj_in, exclude_unset=True, serialize_as_any=True
+        )
         
-        # Hash password if being updated
+        # Hash password if being updated (off the event loop)
         if "password" in update_data:
             password = update_data.pop("password")
-            update_data["hashedPassword"] = get_password_hash(password)
+            update_data["hashedPassword"] = await asyncio.to_thread(get_password_hash, password)
         
-        return await db.user.update(
+        updated = await db.user.update(
             where={"id": id},
             data=update_data
         )
+        # Make the auth dependencies re-read the user on the next request
+        await invalidate_user(id)
+        return updated
+
+    async def add_membership(
+        self, db: Prisma, *, user_id: str, organization_id: str, role: str = "member"
+    ) -> Any:
+        """
+        Add the user to an organization.
+        The user's first membership becomes their primary organization;
+        later ones leave `primary` NULL.
+        """
+        current_primary = await db.member.find_unique(
+            where={"userId_primary": {"userId": user_id, "primary": True}}
+        )
+        membership = await db.member.create(
+            data={
+                "userId": user_id,
+                "organizationId": organization_id,
+                "role": role,
+                "primary": True if current_primary is None else None,
+            }
+        )
+        # The cached organization may have come from the non-primary fallback
+        await invalidate_user(user_id)
+        return membership
 
 
 # Singleton instance for use throughout the app
-user = CRUDUser("user")
+user = CRUDUser("user", UserCreate, UserUpdate)
@@ -2,22 +2,29 @@
 Inopsio AI Enterprise - Database Session
 Manages the Prisma client lifecycle for async database operations.
 """
+import asyncio
+
 from prisma import Prisma
+from prisma.errors import PrismaError
+
+from app.core.config import settings
 
-# Global Prisma client instance
-prisma = Prisma()
+# Global Prisma client instance.
+# The URL comes from settings so the pool parameters added there are applied.
+# Routes receive it through the app.api.deps.get_db dependency (or `db: deps.DB`).
+prisma = Prisma(datasource={"url": settings.DATABASE_URL})
 
 
-async def get_db():
+async def connect_with_retry(attempts: int = 5, delay: float = 1.0) -> None:
     """
-    Dependency injection for database access.
-    Usage in endpoints:
-    
-    @router.get("/users")
-    async def get_users(db: Prisma = Depends(get_db)):
-        users = await db.user.find_many()
-        return users
+    Connect the Prisma client once at startup, retrying while the database comes up.
+    Requests rely on this connection, so there is no per-request connect check.
     """
-    if not prisma.is_connected():
-        await prisma.connect()
-    return prisma
+    for attempt in range(1, attempts + 1):
+        try:
+            await prisma.connect()
+            return
+        except PrismaError:
+            if attempt == attempts:
+                raise
+            await asyncio.sleep(delay * attempt)
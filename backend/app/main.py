@@ -5,106 +5,92 @@ The "Manager" of the Warehouse that handles CORS, Prisma lifecycle, and observab
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+import re
 import time
 import uuid
-import re
 
+from app.api.middleware.preflight import PreflightShortCircuit
 from app.api.v1.api import api_router
+from app.core import cache
 from app.core.config import settings
-from app.db.session import prisma
+from app.db.session import connect_with_retry, prisma
+
+# Bound once so the per-request middleware skips the module attribute lookups
+_uuid4 = uuid.uuid4
+_now_ns = time.perf_counter_ns
 
 
 # 1. LIFESPAN: The 2026 standard for managing connections
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Manages database connection lifecycle."""
-    # Startup: Open the database connection
-    await prisma.connect()
+    """Manages database and shared cache connection lifecycle."""
+    # Startup: Open the database connection (the only place it is opened)
+    await connect_with_retry()
+    await cache.init_redis(settings.REDIS_URL)
     yield
-    # Shutdown: Clean up and close connection
+    # Shutdown: Clean up and close connections
+    await cache.close_redis()
     await prisma.disconnect()
 
 
 app = FastAPI(
     title="Inopsio AI Enterprise API",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
 )
 
 
-# 2. CORS: Dynamic origin validator for Vercel preview URLs
+# 2. CORS: Explicit origins from settings plus Vercel previews and local dev
 # Note: Wildcards don't work with allow_credentials=True
-def is_allowed_origin(origin: str) -> bool:
-    """
-    Validates if an origin is allowed.
-    Supports explicit origins from settings AND Vercel preview URLs.
-    """
-    if not origin:
-        return False
-    
-    # Check explicit origins from settings
-    if origin in settings.CORS_ORIGINS:
-        return True
-    
-    # Allow Vercel preview URLs (pattern: https://*.vercel.app)
-    if re.match(r"^https://[\w-]+\.vercel\.app$", origin):
-        return True
-    
-    # Allow localhost in development
-    if origin.startswith("http://localhost:"):
-        return True
-    
-    return False
+# Compiled once at import; re.compile() hands the same Pattern back to Starlette
+_ALLOWED_ORIGIN_RE = re.compile(r"^(https://[\w-]+\.vercel\.app|http://localhost:\d+)$")
+CORS_ALLOW_METHODS = ["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"]
+CORS_ALLOW_HEADERS = ["Authorization", "Content-Type", "X-Request-ID"]
 
-
-# Custom CORS middleware that validates origins dynamically
-@app.middleware("http")
-async def cors_middleware(request: Request, call_next):
-    """Dynamic CORS validation for Vercel preview URLs."""
-    origin = request.headers.get("origin")
-    
-    # Handle preflight requests
-    if request.method == "OPTIONS":
-        if origin and is_allowed_origin(origin):
-            response = await call_next(request)
-            response.headers["Access-Control-Allow-Origin"] = origin
-            response.headers["Access-Control-Allow-Credentials"] = "true"
-            response.headers["Access-Control-Allow-Methods"] = "GET, POST, PUT, PATCH, DELETE, OPTIONS"
-            response.headers["Access-Control-Allow-Headers"] = "Authorization, Content-Type, X-Request-ID"
-            response.headers["Access-Control-Expose-Headers"] = "X-Request-ID, X-Process-Time"
-            return response
-    
-    response = await call_next(request)
-    
-    # Add CORS headers for allowed origins
-    if origin and is_allowed_origin(origin):
-        response.headers["Access-Control-Allow-Origin"] = origin
-        response.headers["Access-Control-Allow-Credentials"] = "true"
-        response.headers["Access-Control-Expose-Headers"] = "X-Request-ID, X-Process-Time"
-    
-    return response
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=settings.CORS_ORIGINS_SET,
+    allow_origin_regex=_ALLOWED_ORIGIN_RE,
+    allow_credentials=True,
+    allow_methods=CORS_ALLOW_METHODS,
+    allow_headers=CORS_ALLOW_HEADERS,
+    expose_headers=["X-Request-ID", "X-Process-Time"],
+)
 
 
 # 3. OBSERVABILITY: Request tracking for 100k+ DAU
 @app.middleware("http")
 async def add_process_time_and_request_id(request: Request, call_next):
-    """Adds timing and unique ID to every request for debugging and tracing."""
-    start_time = time.time()
+    """
+    Adds timing and unique ID to every request for debugging and tracing.
+    X-Process-Time is the server-side handling time in integer microseconds.
+    """
+    start_ns = _now_ns()
     
     # Use client-provided request ID if present, otherwise generate one
-    request_id = request.headers.get("X-Request-ID") or str(uuid.uuid4())
+    request_id = request.headers.get("X-Request-ID") or _uuid4().hex
     
     # Process the request
     response = await call_next(request)
     
-    # Add headers for debugging
-    process_time = time.time() - start_time
-    response.headers["X-Process-Time"] = str(process_time)
+    # Add headers for debugging (microseconds)
+    response.headers["X-Process-Time"] = str((_now_ns() - start_ns) // 1000)
     response.headers["X-Request-ID"] = request_id
     return response
 
 
-# 4. ROUTER: Connect the API endpoints
+# 4. PREFLIGHT: Added last so it is the outermost layer; allowed preflights
+# get their 204 without passing through the middleware above or the router
+app.add_middleware(
+    PreflightShortCircuit,
+    allow_origins=settings.CORS_ORIGINS_SET,
+    allow_origin_regex=_ALLOWED_ORIGIN_RE,
+    allow_methods=CORS_ALLOW_METHODS,
+    allow_headers=CORS_ALLOW_HEADERS,
+)
+
+
+# 5. ROUTER: Connect the API endpoints
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
 
@@ -14,8 +14,12 @@ class Token(BaseModel):
 class TokenPayload(BaseModel):
     """
     The payload inside a JWT token.
+    Documents the claims; the auth dependency checks them directly for speed.
     
     - sub: The subject (user_id)
-    - exp: Expiration timestamp (handled by jose)
+    - exp: Expiration timestamp (verified on decode, used to bound caching)
+    - org_id: The primary organization_id, resolved at login
     """
     sub: str | None = None
+    exp: int | None = None
+    org_id: str | None = None
@@ -0,0 +1,16 @@
+-- backend/prisma/sql/backfill_member_primary.sql
+-- Marks exactly one membership per user as primary, for users that have none.
+-- Owner memberships are preferred. Safe to re-run.
+--
+-- Run after `prisma db push` / `prisma migrate` has added the "primary" column:
+--   prisma db execute --file prisma/sql/backfill_member_primary.sql --schema prisma/schema.prisma
+
+UPDATE "Member" AS m
+SET "primary" = true
+FROM (
+  SELECT DISTINCT ON ("userId") "id"
+  FROM "Member"
+  WHERE "userId" NOT IN (SELECT "userId" FROM "Member" WHERE "primary" = true)
+  ORDER BY "userId", ("role" = 'owner') DESC, "id"
+) AS first_membership
+WHERE m."id" = first_membership."id";